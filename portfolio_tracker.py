@@ -1,12 +1,341 @@
 import streamlit as st
 import yfinance as yf
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+from curl_cffi import requests as curl_requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from pathlib import Path
+from tsdownsample import MinMaxLTTBDownsampler
+from numba import njit
+import os
+import threading
 
 # Set page configuration
 st.set_page_config(page_title="Stock Portfolio Tracker", layout="wide")
 
+# Longest lookback offered by the history slider
+MAX_LOOKBACK_DAYS = 365 * 5
+
+# Yahoo's spark endpoint returns a tiny price series for up to 20 symbols per request
+SPARK_URL = "https://query1.finance.yahoo.com/v8/finance/spark"
+SPARK_BATCH_SIZE = 20
+
+# On-disk price history, one Parquet file per ticker, so cold starts only fetch new days
+CACHE_DIR = Path.home() / ".portfolio_tracker_cache"
+
+# Long histories are downsampled before charting so the browser gets a bounded payload
+DOWNSAMPLE_THRESHOLD = 5000  # days_lookback * number of tickers
+DOWNSAMPLE_POINTS = 1000
+
+# Allocation slices smaller than this share of the total are grouped as "Other"
+PIE_OTHER_FRACTION = 0.01
+
+# Shared HTTP session for every Yahoo request (validation and yfinance downloads); browser
+# impersonation avoids rate limiting. curl_cffi keeps one connection per thread, so all Yahoo
+# requests run on a long-lived worker pool, letting TLS connections survive across reruns.
+HTTP_WORKERS = 8
+
+@st.cache_resource
+def _http_session():
+    """Create the process-wide session once; Streamlit re-executes this module on every rerun."""
+    return curl_requests.Session(impersonate="chrome")
+
+@st.cache_resource
+def _http_executor():
+    """Create the process-wide worker pool that issues every Yahoo request."""
+    return ThreadPoolExecutor(max_workers=HTTP_WORKERS, thread_name_prefix="yahoo")
+
+SESSION = _http_session()
+
+def _ticker_column(data, field, ticker):
+    """Pull one field for one ticker out of a yf.download frame as a Series."""
+    if field not in data.columns.get_level_values(0):
+        return pd.Series(dtype='float64', index=data.index)
+    column = data[field]
+    if isinstance(column, pd.DataFrame):
+        column = column.reindex(columns=[ticker])[ticker]
+    return column
+
+def _download_close(ticker, start, end):
+    """Download one ticker's closing prices and split ratios as Series (empty if Yahoo has none)."""
+    data = yf.download(
+        ticker,
+        start=start,
+        end=end,
+        progress=False,
+        threads=False,
+        auto_adjust=False,
+        actions=True,
+        session=SESSION
+    )
+    close = _ticker_column(data, 'Close', ticker).dropna()
+    splits = _ticker_column(data, 'Stock Splits', ticker).fillna(0)
+    return close, splits
+
+def _batch_close(tickers, start, end):
+    """Download (close, splits) for several tickers concurrently (yfinance makes one request per ticker)."""
+    closes = _http_executor().map(lambda t: _download_close(t, start, end), tickers)
+    return dict(zip(tickers, closes))
+
+def _read_cached(ticker):
+    """Return the disk-cached closing prices for a ticker, or None if there are none."""
+    try:
+        cached = pd.read_parquet(CACHE_DIR / f"{ticker}.parquet")['Close']
+    except Exception:
+        return None
+    return None if cached.empty else cached
+
+def _write_cached(ticker, close):
+    """Store a ticker's closing prices in the disk cache."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = CACHE_DIR / f"{ticker}.parquet"
+    # Write to a temp file first so a concurrent reader never sees a partial file
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    close.to_frame('Close').to_parquet(tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_close(tickers_tuple, start, end):
+    """Load closing prices for all tickers, memoized on (tickers, start, end) across reruns.
+
+    Prices come from the disk cache; only the days from each ticker's last cached close onward are
+    downloaded, with all tickers that share the same gap fetched concurrently.
+    """
+    closes = {ticker: _read_cached(ticker) for ticker in tickers_tuple}
+
+    # Yahoo's Close is split-adjusted even with auto_adjust=False, so the top-up re-reads the
+    # last cached day: if that close moved or a split landed in the gap, the cache is stale
+    gaps = {}
+    for ticker, cached in closes.items():
+        gap_start = start if cached is None else cached.index.max().date()
+        if gap_start < end:
+            gaps.setdefault(gap_start, []).append(ticker)
+
+    stale = []
+    for gap_start, group in gaps.items():
+        fresh = _batch_close(group, gap_start, end)
+        for ticker in group:
+            new_rows, splits = fresh[ticker]
+            cached = closes[ticker]
+            if cached is not None:
+                last_day = cached.index.max()
+                overlap = new_rows.get(last_day)
+                if (splits[splits.index > last_day] != 0).any() or (
+                    overlap is not None and not np.isclose(overlap, cached[last_day])
+                ):
+                    stale.append(ticker)
+                    continue
+                new_rows = new_rows[new_rows.index > last_day]
+                if new_rows.empty:
+                    continue
+                new_rows = pd.concat([cached, new_rows])
+            elif new_rows.empty:
+                continue
+            closes[ticker] = new_rows
+            _write_cached(ticker, new_rows)
+
+    # Rewrite stale histories from a full download so every row is on the same split basis
+    if stale:
+        fresh = _batch_close(stale, start, end)
+        for ticker in stale:
+            new_rows, _ = fresh[ticker]
+            if not new_rows.empty:
+                closes[ticker] = new_rows
+                _write_cached(ticker, new_rows)
+
+    # Tickers Yahoo returned nothing for become all-NaN columns
+    empty = pd.Series(dtype='float64', index=pd.DatetimeIndex([]))
+    df = pd.concat(
+        {ticker: empty if close is None else close for ticker, close in closes.items()},
+        axis=1
+    )
+    return df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+
+def _validate_chunk(chunk: list[str]) -> set[str]:
+    """Return the symbols in one spark-sized chunk that Yahoo has price data for."""
+    resp = SESSION.get(
+        SPARK_URL,
+        params={"symbols": ",".join(chunk), "range": "1d", "interval": "1d"},
+        timeout=10
+    )
+    # Yahoo answers 404 when none of the symbols in the chunk exist
+    if resp.status_code == 404:
+        return set()
+    resp.raise_for_status()
+    valid = set()
+    for symbol, data in resp.json().items():
+        closes = (data or {}).get("close") or []
+        if any(c is not None for c in closes):
+            valid.add(symbol)
+    return valid
+
+def _validate_tickers(tickers: list[str]) -> set[str]:
+    """Return the subset of tickers Yahoo has price data for, checking chunks concurrently."""
+    chunks = [tickers[i:i + SPARK_BATCH_SIZE] for i in range(0, len(tickers), SPARK_BATCH_SIZE)]
+    # Requests are I/O-bound, so the pool's threads overlap the round-trips
+    return set().union(*_http_executor().map(_validate_chunk, chunks))
+
+def _trace_xy(dates, values, downsample):
+    """Return (x, y) arrays for one chart trace, reduced with MinMax-LTTB when downsample is set."""
+    # Plain ndarrays (float32 values) let Plotly send typed arrays instead of JSON number lists
+    y = np.asarray(values, dtype='float32')
+    keep = np.flatnonzero(~np.isnan(y))
+    x, y = dates[keep], y[keep]
+    if not downsample or len(y) <= DOWNSAMPLE_POINTS:
+        return x, y
+    # Dates are ISO strings, so downsample against trading-day positions instead
+    idx = MinMaxLTTBDownsampler().downsample(keep, y, n_out=DOWNSAMPLE_POINTS)
+    return x[idx], y[idx]
+
+@njit(cache=True, fastmath={"reassoc", "contract"})
+def _holding_values(prices, shares):
+    """Return per-asset values and daily totals in one pass; NaN prices are left out of the total."""
+    n_days, n_assets = prices.shape
+    values = np.empty((n_days, n_assets), dtype=np.float64)
+    totals = np.empty(n_days, dtype=np.float64)
+    for i in range(n_days):
+        s = 0.0
+        for j in range(n_assets):
+            v = prices[i, j] * shares[j]
+            values[i, j] = v
+            if not np.isnan(v):
+                s += v
+        totals[i] = s
+    return values, totals
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _compute_portfolio(items_key, days, end_date):
+    """Compute chart arrays and start/current totals, memoized so unrelated reruns skip it."""
+    tickers = [ticker for ticker, _ in items_key]
+    start_date = end_date - timedelta(days=days)
+    fetch_start = end_date - timedelta(days=MAX_LOOKBACK_DAYS)
+
+    # Download data
+    # Always fetch the full slider range so one cached download serves every lookback
+    df = _fetch_close(tuple(sorted(tickers)), fetch_start, end_date)
+
+    # Slice the requested window in memory and drop rows where all data is NaN (e.g. non-trading days)
+    df = df.loc[df.index >= pd.Timestamp(start_date)].dropna(how='all')
+
+    # Price matrix (days x tickers), row-major to match the row-wise kernel below
+    prices = np.ascontiguousarray(df.reindex(columns=tickers).to_numpy(dtype='float64'))
+    shares = np.fromiter((n for _, n in items_key), dtype='float64', count=len(items_key))
+
+    # Calculate Value for each stock (Price * Shares) and Total Portfolio Value in one compiled pass
+    values, totals = _holding_values(prices, shares)
+    start_total, current_total = float(totals[0]), float(totals[-1])
+
+    # Charts only need single precision; halves the payload sent to the browser.
+    # Dates are pre-formatted once here so Plotly doesn't convert each Timestamp on every render.
+    return (
+        df.index.strftime('%Y-%m-%d').to_numpy(),
+        values.astype('float32'),
+        totals.astype('float32'),
+        start_total,
+        current_total
+    )
+
+# Shared chart layout, registered once per process and layered over Plotly's default template
+if 'portfolio' not in pio.templates:
+    pio.templates['portfolio'] = go.layout.Template(layout=dict(
+        hovermode="x unified",
+        xaxis=dict(title=dict(text='Date'))
+    ))
+    pio.templates.default = 'plotly+portfolio'
+
+def _downsample_enabled(items_key, days):
+    """Downsample only when the chart payload would get large."""
+    return days * len(items_key) > DOWNSAMPLE_THRESHOLD
+
+# Figures are cached as resources (no pickling) so reruns reuse the built, validated object
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _build_fig_total(items_key, days, end_date):
+    """Main Area Chart (Total Value), rendered with WebGL."""
+    dates, _, totals, _, _ = _compute_portfolio(items_key, days, end_date)
+    x, y = _trace_xy(dates, totals, _downsample_enabled(items_key, days))
+    fig = go.Figure(go.Scattergl(x=x, y=y, mode='lines', fill='tozeroy', name='Total Value'))
+    fig.update_layout(
+        title=f"Total Portfolio Value (Past {days} Days)",
+        yaxis_title='Value (USD)'
+    )
+    return fig
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _build_fig_breakdown(items_key, days, end_date):
+    """Individual Stock Performance, one WebGL trace per asset."""
+    dates, values, _, _, _ = _compute_portfolio(items_key, days, end_date)
+    downsample = _downsample_enabled(items_key, days)
+    # Each trace is downsampled independently to keep its own extremes
+    fig = go.Figure()
+    for j, (ticker, _) in enumerate(items_key):
+        x, y = _trace_xy(dates, values[:, j], downsample)
+        fig.add_trace(go.Scattergl(x=x, y=y, mode='lines', name=ticker))
+    fig.update_layout(
+        title="Value by Asset Over Time",
+        yaxis_title='Holding Value (USD)',
+        legend_title_text='Ticker'
+    )
+    return fig
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _build_fig_pie(items_key, days, end_date):
+    """Composition Pie Chart, straight from the last row of holding values."""
+    _, values, _, _, _ = _compute_portfolio(items_key, days, end_date)
+    tickers = [ticker for ticker, _ in items_key]
+    pie_values = np.nan_to_num(values[-1])
+    pie_names = tickers
+    # Fold holdings under 1% into a single "Other" slice when there are several
+    small = pie_values < PIE_OTHER_FRACTION * pie_values.sum()
+    if small.sum() > 1:
+        pie_names = [t for t, is_small in zip(tickers, small) if not is_small] + ["Other"]
+        pie_values = np.append(pie_values[~small], pie_values[small].sum())
+    return px.pie(
+        values=pie_values.tolist(),
+        names=pie_names,
+        title="Current Allocation",
+        hole=0.4
+    )
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _csv_bytes(items_key):
+    """Serialize (ticker, shares) pairs to the portfolio CSV format."""
+    return b"ticker,shares\n" + b"".join(f"{ticker},{shares}\n".encode('utf-8') for ticker, shares in items_key)
+
+def _apply_portfolio_edits(editor_key, items):
+    """Apply every pending change from the portfolio editor to the portfolio in one update."""
+    changes = st.session_state[editor_key]
+    rows = [{'ticker': ticker, 'shares': shares} for ticker, shares in items]
+    for i, edits in changes['edited_rows'].items():
+        rows[int(i)].update(edits)
+    deleted = set(changes['deleted_rows'])
+    rows = [row for i, row in enumerate(rows) if i not in deleted] + changes['added_rows']
+
+    portfolio = {}
+    for row in rows:
+        ticker = str(row.get('ticker') or '').strip().upper()
+        if ticker and row.get('shares'):
+            portfolio[ticker] = float(row['shares'])
+
+    # New or renamed tickers go through the same validation as the Add Stock form
+    unknown = [ticker for ticker in portfolio if ticker not in st.session_state.portfolio]
+    if unknown:
+        try:
+            valid = _validate_tickers(unknown)
+        except Exception:
+            valid = set()
+        rejected = [ticker for ticker in unknown if ticker not in valid]
+        for ticker in rejected:
+            del portfolio[ticker]
+        if rejected:
+            st.session_state.edit_warning = f"Could not find data for {', '.join(rejected)}."
+
+    st.session_state.portfolio = portfolio
+    st.session_state.editor_version += 1
+
 def main():
     st.title("📈 Stock Portfolio Tracker")
     st.markdown("""
@@ -16,8 +345,12 @@ def main():
 
     # --- Session State Management ---
     # Initialize portfolio in session state if it doesn't exist
+    # Portfolio maps ticker -> shares held (insertion order is display order)
     if 'portfolio' not in st.session_state:
-        st.session_state.portfolio = []
+        st.session_state.portfolio = {}
+    # Bumped whenever the portfolio changes so the editor widget restarts from fresh data
+    if 'editor_version' not in st.session_state:
+        st.session_state.editor_version = 0
 
     # --- Sidebar: Input & Portfolio Management ---
     with st.sidebar:
@@ -29,9 +362,8 @@ def main():
             
             # 1. Download Logic
             if st.session_state.portfolio:
-                # Convert current portfolio to CSV
-                csv_df = pd.DataFrame(st.session_state.portfolio)
-                csv_data = csv_df.to_csv(index=False).encode('utf-8')
+                # Convert current portfolio to CSV (cached, so unchanged portfolios skip it)
+                csv_data = _csv_bytes(tuple(st.session_state.portfolio.items()))
                 
                 st.download_button(
                     label="Download Portfolio (CSV)",
@@ -45,15 +377,35 @@ def main():
             uploaded_file = st.file_uploader("Load Portfolio", type=['csv'])
             if uploaded_file is not None:
                 try:
-                    # Read CSV
-                    uploaded_df = pd.read_csv(uploaded_file)
+                    # Read just the header to validate the format
+                    columns = pd.read_csv(uploaded_file, nrows=0).columns
+                    uploaded_file.seek(0)
                     
                     # Validate format
-                    if 'ticker' in uploaded_df.columns and 'shares' in uploaded_df.columns:
-                        # Convert back to list of dicts
-                        st.session_state.portfolio = uploaded_df.to_dict('records')
-                        st.success("Portfolio loaded successfully!")
-                        # No rerun needed here usually, but helps refresh the UI immediately if glitchy
+                    if 'ticker' in columns and 'shares' in columns:
+                        # Only process each upload once, otherwise every rerun would reload it
+                        if st.session_state.get('loaded_upload_id') != uploaded_file.file_id:
+                            # Typed read of only the needed columns, parsed by the pyarrow engine
+                            uploaded_df = pd.read_csv(
+                                uploaded_file,
+                                usecols=['ticker', 'shares'],
+                                dtype={'ticker': 'string[pyarrow]', 'shares': 'float64'},
+                                engine='pyarrow'
+                            ).dropna()
+                            uploaded_df['ticker'] = uploaded_df['ticker'].str.strip().str.upper()
+                            # Reject unknown tickers before they reach the portfolio
+                            valid = _validate_tickers(uploaded_df['ticker'].unique().tolist())
+                            invalid_mask = ~uploaded_df['ticker'].isin(valid)
+                            if invalid_mask.any():
+                                skipped = ", ".join(uploaded_df.loc[invalid_mask, 'ticker'].unique())
+                                st.warning(f"Skipped tickers with no market data: {skipped}")
+                            uploaded_df = uploaded_df[~invalid_mask]
+                            # Convert back to a ticker -> shares mapping
+                            st.session_state.portfolio = dict(
+                                zip(uploaded_df['ticker'], uploaded_df['shares'].astype(float))
+                            )
+                            st.session_state.loaded_upload_id = uploaded_file.file_id
+                            st.success("Portfolio loaded successfully!")
                     else:
                         st.error("CSV must have 'ticker' and 'shares' columns.")
                 except Exception as e:
@@ -69,19 +421,13 @@ def main():
         if submit_button:
             if ticker_input:
                 # Basic check to see if it's already added
-                if any(d['ticker'] == ticker_input for d in st.session_state.portfolio):
+                if ticker_input in st.session_state.portfolio:
                     st.warning(f"{ticker_input} is already in your portfolio.")
                 else:
-                    # Verify ticker validity by trying to fetch info (lightweight check)
+                    # Verify ticker validity with a lightweight spark request
                     try:
-                        ticker_data = yf.Ticker(ticker_input)
-                        # We fetch history just to check if it exists/is valid
-                        hist = ticker_data.history(period="1d")
-                        if not hist.empty:
-                            st.session_state.portfolio.append({
-                                "ticker": ticker_input,
-                                "shares": shares_input
-                            })
+                        if ticker_input in _validate_tickers([ticker_input]):
+                            st.session_state.portfolio[ticker_input] = shares_input
                             st.success(f"Added {ticker_input}")
                         else:
                             st.error(f"Could not find data for {ticker_input}.")
@@ -92,14 +438,28 @@ def main():
 
         # Display Current Portfolio in Sidebar
         st.subheader("Your Assets")
+        edit_warning = st.session_state.pop('edit_warning', None)
+        if edit_warning:
+            st.warning(edit_warning)
         if st.session_state.portfolio:
-            for i, item in enumerate(st.session_state.portfolio):
-                col1, col2, col3 = st.columns([2, 2, 1])
-                col1.write(f"**{item['ticker']}**")
-                col2.write(f"{item['shares']} sh")
-                if col3.button("❌", key=f"remove_{i}"):
-                    st.session_state.portfolio.pop(i)
-                    st.rerun()
+            # Editable table: edits/deletions are applied together in one callback, no extra rerun
+            editor_key = f"portfolio_editor_{st.session_state.editor_version}"
+            st.data_editor(
+                pd.DataFrame({
+                    'ticker': list(st.session_state.portfolio),
+                    'shares': list(st.session_state.portfolio.values())
+                }),
+                key=editor_key,
+                num_rows='dynamic',
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    'ticker': st.column_config.TextColumn("Ticker", required=True),
+                    'shares': st.column_config.NumberColumn("Shares", min_value=0.01, step=0.1, required=True)
+                },
+                on_change=_apply_portfolio_edits,
+                args=(editor_key, tuple(st.session_state.portfolio.items()))
+            )
         else:
             st.info("No stocks added yet.")
 
@@ -118,7 +478,7 @@ def main():
         days_lookback = st.slider(
             "History Duration (Days)", 
             min_value=30, 
-            max_value=365 * 5, # Up to 5 years
+            max_value=MAX_LOOKBACK_DAYS, # Up to 5 years
             value=365, 
             step=30
         )
@@ -126,39 +486,16 @@ def main():
     # 2. Data Fetching & Processing
     with st.spinner('Fetching market data...'):
         try:
-            # Prepare list of tickers
-            tickers = [item['ticker'] for item in st.session_state.portfolio]
-            share_map = {item['ticker']: item['shares'] for item in st.session_state.portfolio}
+            # Hashable snapshot of the portfolio, in display order
+            items_key = tuple(st.session_state.portfolio.items())
 
-            # Calculate dates
             # We set end_date to today (exclusive), ensuring we only fetch up to yesterday's close
             end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=days_lookback)
-            
-            # Download data
-            # using threads=True for faster download
-            df = yf.download(tickers, start=start_date, end=end_date, progress=False)['Close']
-
-            # Handle case where yfinance returns a Series (single stock) vs DataFrame (multiple)
-            if isinstance(df, pd.Series):
-                df = df.to_frame(name=tickers[0])
-
-            # Drop rows where all data is NaN (e.g. non-trading days)
-            df.dropna(how='all', inplace=True)
-
-            # Calculate Value for each stock: Price * Shares
-            portfolio_value_df = pd.DataFrame(index=df.index)
-            
-            for ticker in tickers:
-                if ticker in df.columns:
-                    portfolio_value_df[ticker] = df[ticker] * share_map[ticker]
-            
-            # Calculate Total Portfolio Value
-            portfolio_value_df['Total Value'] = portfolio_value_df.sum(axis=1)
+            _, _, _, start_total, current_total = _compute_portfolio(
+                items_key, days_lookback, end_date
+            )
 
             # --- Display Metrics ---
-            current_total = portfolio_value_df['Total Value'].iloc[-1]
-            start_total = portfolio_value_df['Total Value'].iloc[0]
             delta = current_total - start_total
             delta_percent = (delta / start_total) * 100
 
@@ -172,44 +509,22 @@ def main():
             # --- Charts ---
             st.subheader("Portfolio Performance")
             
-            # Main Area Chart (Total Value)
-            fig_total = px.area(
-                portfolio_value_df, 
-                x=portfolio_value_df.index, 
-                y='Total Value',
-                title=f"Total Portfolio Value (Past {days_lookback} Days)",
-                labels={'x': 'Date', 'Total Value': 'Value (USD)'}
-            )
-            fig_total.update_layout(hovermode="x unified")
-            st.plotly_chart(fig_total, use_container_width=True)
-
-            # Individual Stock Performance (Line Chart)
-            st.subheader("Individual Asset Contribution")
-            # Drop the 'Total Value' column for this chart
-            individual_df = portfolio_value_df.drop(columns=['Total Value'])
-            
-            fig_breakdown = px.line(
-                individual_df, 
-                x=individual_df.index, 
-                y=individual_df.columns,
-                title="Value by Asset Over Time",
-                labels={'x': 'Date', 'value': 'Holding Value (USD)', 'variable': 'Ticker'}
-            )
-            fig_breakdown.update_layout(hovermode="x unified")
-            st.plotly_chart(fig_breakdown, use_container_width=True)
-
-            # Composition Pie Chart
-            current_composition = individual_df.iloc[-1].reset_index()
-            current_composition.columns = ['Ticker', 'Value']
-            
-            fig_pie = px.pie(
-                current_composition, 
-                values='Value', 
-                names='Ticker', 
-                title="Current Allocation",
-                hole=0.4
+            # Tabs rerun on selection, so only the open tab's figure is built (and cached) and sent
+            tab_total, tab_breakdown, tab_pie = st.tabs(
+                ["Total", "By Asset", "Allocation"], key="chart_tab", on_change="rerun"
             )
-            st.plotly_chart(fig_pie, use_container_width=True)
+            if tab_total.open:
+                with tab_total:
+                    fig_total = _build_fig_total(items_key, days_lookback, end_date)
+                    st.plotly_chart(fig_total, use_container_width=True)
+            if tab_breakdown.open:
+                with tab_breakdown:
+                    fig_breakdown = _build_fig_breakdown(items_key, days_lookback, end_date)
+                    st.plotly_chart(fig_breakdown, use_container_width=True)
+            if tab_pie.open:
+                with tab_pie:
+                    fig_pie = _build_fig_pie(items_key, days_lookback, end_date)
+                    st.plotly_chart(fig_pie, use_container_width=True)
 
         except Exception as e:
             st.error(f"An error occurred while processing data: {e}")